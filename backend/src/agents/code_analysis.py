@@ -1,12 +1,19 @@
 import os
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from pydantic import BaseModel
 from fastapi import FastAPI, UploadFile, File, Form
 from langchain_ollama import OllamaLLM
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 
-llm = OllamaLLM(model="deepseek-coder:1.3b")
+from agents.review_stream import stream_review
+from config import REVIEW_NUM_PREDICT, REVIEW_REPEAT_PENALTY
+
+llm = OllamaLLM(
+    model="deepseek-coder:1.3b",
+    num_predict=REVIEW_NUM_PREDICT,
+    repeat_penalty=REVIEW_REPEAT_PENALTY
+)
 
 
 class CodeReviewState(BaseModel):
@@ -16,6 +23,7 @@ class CodeReviewState(BaseModel):
     file_extensions: List[str] = []
     files_found: List[str] = []
     report: Dict[str, str] = {}
+    sections: Dict[str, Dict[str, str]] = {}
 
 
 workflow = StateGraph(CodeReviewState)
@@ -54,6 +62,7 @@ def find_files_found(state: CodeReviewState) -> CodeReviewState:
 def review_code(state: CodeReviewState) -> CodeReviewState:
     """Analyzes each file for errors, optimizations, and improvements."""
     report = {}
+    sections = {}
     for file in state.files_found:
         with open(file, "r", encoding="utf-8") as f:
             code = f.read()
@@ -95,6 +104,7 @@ def review_code(state: CodeReviewState) -> CodeReviewState:
         # **Code Review for:** {os.path.basename(file)} ({file_extension[1:]})
         ```{file_extension[1:]}
         {code}
+        ```
         
         Response Format
         Provide the final output as a markdown formatted string
@@ -120,16 +130,17 @@ def review_code(state: CodeReviewState) -> CodeReviewState:
 
         Do NOT describe the file’s purpose—focus only on the code review.
         Do NOT make assumptions about missing parts—analyze only what is provided.
+        Keep every section short and write each section exactly once.
         Follow this structured format exactly to ensure a high-quality review. """
 
-        feedback = llm.invoke(prompt)
-        report[file] = feedback
+        report[file], sections[file] = stream_review(llm, prompt)
 
     return CodeReviewState(
         file_path=state.file_path,
         project_path=state.project_path,
         files_found=state.files_found,
-        report=report
+        report=report,
+        sections=sections
     )
 
 
@@ -140,7 +151,7 @@ workflow.add_edge("review_code", END)
 code_review_executor = workflow.compile()
 
 
-def get_code_review_for_file(file_path: str) -> dict:
+def get_code_review_for_file(file_path: str) -> Tuple[dict, dict]:
     result = code_review_executor.invoke(
         CodeReviewState(
             file_path=file_path,
@@ -150,9 +161,9 @@ def get_code_review_for_file(file_path: str) -> dict:
         )
     )
 
-    return dict(result['report'])
+    return dict(result['report']), dict(result['sections'])
 
-def get_code_review_for_folder(project_path: str, ignore_files, file_extensions) -> dict:
+def get_code_review_for_folder(project_path: str, ignore_files, file_extensions) -> Tuple[dict, dict]:
     result = code_review_executor.invoke(
         CodeReviewState(
             file_path="",
@@ -162,4 +173,4 @@ def get_code_review_for_folder(project_path: str, ignore_files, file_extensions)
         )
     )
 
-    return dict(result['report'])
+    return dict(result['report']), dict(result['sections'])
@@ -0,0 +1,159 @@
+import re
+from collections import deque
+from contextlib import closing
+from typing import Dict, List, Tuple
+
+from config import (
+    REVIEW_NUM_PREDICT,
+    REVIEW_REPEAT_LIMIT,
+    REVIEW_REPEAT_WINDOW,
+    REVIEW_SECTION_HARD_LIMIT,
+    REVIEW_SECTION_TOKEN_BUDGET,
+)
+
+REVIEW_SECTIONS = [
+    ("errors_and_bugs", "Errors & Bugs"),
+    ("performance_and_optimization", "Performance & Optimization"),
+    ("code_quality_and_maintainability", "Code Quality & Maintainability"),
+    ("security_and_reliability", "Security & Reliability"),
+    ("best_practices_and_standards", "Best Practices & Standards"),
+]
+
+HEADING_NUMBER_PATTERN = re.compile(r"^(?:section\s+)?\d+\s*[.):-]?\s*")
+MARKDOWN_HEADING_PATTERN = re.compile(r"^\s*(#{1,6})\s+\S")
+
+
+def normalize_heading(line: str) -> str:
+    """Strips markdown decoration and numbering from a line so it can be compared with a section title."""
+    text = line.strip().lower().replace("*", "").replace("_", "").lstrip("#").strip()
+    text = HEADING_NUMBER_PATTERN.sub("", text)
+    text = text.replace("&", " and ").rstrip(":").strip()
+    return " ".join(text.split())
+
+
+SECTION_TITLES = {normalize_heading(title): index for index, (_, title) in enumerate(REVIEW_SECTIONS)}
+
+
+def match_section_heading(line: str) -> int:
+    """Returns the index of the review section a heading line opens, or -1 if it is not a heading."""
+    return SECTION_TITLES.get(normalize_heading(line), -1)
+
+
+def heading_level(line: str) -> int:
+    """Returns the markdown level of a `#` heading line, or 0 if it is not one."""
+    match = MARKDOWN_HEADING_PATTERN.match(line)
+    return len(match.group(1)) if match else 0
+
+
+def is_repeat_candidate(line: str) -> bool:
+    """Tells whether a line is worth tracking for runaway repetition. Punctuation-only lines repeat legitimately."""
+    return any(char.isalnum() for char in line)
+
+
+def stream_review(llm, prompt: str) -> Tuple[str, Dict[str, str]]:
+    """Streams a review from the model, enforcing per-section budgets and stopping early when it is complete.
+
+    Returns the markdown review together with its text split per section. If the model never writes a
+    recognisable section heading, the raw streamed text is returned as the review.
+    """
+    sections: Dict[str, List[str]] = {key: [] for key, _ in REVIEW_SECTIONS}
+    raw_lines: List[str] = []
+    review_lines: List[str] = []
+    recent_lines = deque(maxlen=REVIEW_REPEAT_WINDOW)
+    seen_headings = set()
+    current = -1
+    section_level = 0
+    section_tokens = 0
+    total_tokens = 0
+    in_fence = False
+    fence_open = False
+    pending = ""
+
+    def close_fence():
+        """Closes a code block left open when a section's text was cut short."""
+        nonlocal fence_open
+        if fence_open:
+            review_lines.append("```")
+            sections[REVIEW_SECTIONS[current][0]].append("```")
+            fence_open = False
+
+    def accept_line(line: str) -> bool:
+        """Files a completed line under its section. Returns False once generation should stop."""
+        nonlocal current, section_level, section_tokens, in_fence, fence_open
+
+        raw_lines.append(line)
+        stripped = line.strip()
+        is_fence = stripped.startswith("```")
+
+        # A section title also ends a code block the model forgot to close.
+        heading = match_section_heading(line)
+        if heading != -1:
+            # Seeing a heading again means the model is starting the review over.
+            if heading in seen_headings:
+                return False
+            if current != -1:
+                close_fence()
+            seen_headings.add(heading)
+            current = heading
+            section_level = heading_level(line)
+            section_tokens = 0
+            in_fence = False
+            recent_lines.clear()
+            review_lines.append(line)
+            return True
+
+        # Once every section has been written, a `#` heading no deeper than the section headings is a trailer.
+        last = len(REVIEW_SECTIONS) - 1
+        if current == last and section_level and sections[REVIEW_SECTIONS[last][0]] and not in_fence \
+                and 0 < heading_level(line) <= section_level:
+            return False
+
+        if is_fence:
+            in_fence = not in_fence
+        elif stripped and not in_fence and is_repeat_candidate(stripped):
+            recent_lines.append(stripped)
+            if recent_lines.count(stripped) >= REVIEW_REPEAT_LIMIT:
+                return False
+
+        if current == -1:
+            review_lines.append(line)
+            return True
+
+        if section_tokens > REVIEW_SECTION_TOKEN_BUDGET:
+            return True
+
+        if is_fence:
+            fence_open = not fence_open
+        review_lines.append(line)
+        sections[REVIEW_SECTIONS[current][0]].append(line)
+        return True
+
+    with closing(llm.stream(prompt)) as stream:
+        for chunk in stream:
+            section_tokens += 1
+            total_tokens += 1
+            pending += chunk
+            *lines, pending = pending.split("\n")
+            if not all(accept_line(line) for line in lines):
+                pending = ""
+                break
+
+            if total_tokens > REVIEW_NUM_PREDICT:
+                break
+
+            # A section far past its budget would otherwise hold up the response; later sections are dropped.
+            if current != -1 and section_tokens > REVIEW_SECTION_HARD_LIMIT:
+                break
+
+            # The last section has no following heading to wait for, so stop as soon as it is spent.
+            if current == len(REVIEW_SECTIONS) - 1 and section_tokens > REVIEW_SECTION_TOKEN_BUDGET:
+                break
+
+    if pending:
+        accept_line(pending)
+
+    if current == -1:
+        return "\n".join(raw_lines).strip(), {key: "" for key, _ in REVIEW_SECTIONS}
+
+    close_fence()
+    return "\n".join(review_lines).strip(), {key: "\n".join(lines).strip() for key, lines in sections.items()}
@@ -0,0 +1,13 @@
+# Generation limits for the code review agent. Ollama streams roughly one
+# token per chunk, so the section budgets are counted in streamed chunks.
+REVIEW_NUM_PREDICT = 1200
+REVIEW_SECTION_TOKEN_BUDGET = 220
+# Past the budget a section's lines are dropped; past the hard limit the
+# stream is closed so a rambling section cannot hold up the response.
+REVIEW_SECTION_HARD_LIMIT = 330
+REVIEW_REPEAT_PENALTY = 1.15
+
+# A review is cut off once the same line shows up this many times within
+# the last REVIEW_REPEAT_WINDOW non-empty lines.
+REVIEW_REPEAT_LIMIT = 3
+REVIEW_REPEAT_WINDOW = 12
@@ -8,12 +8,14 @@ app = FastAPI(title="CodePulse AI", version="1.0")
 
 @app.get("/review_file")
 async def review_file(file_path: str) -> dict:
-    return {"review": get_code_review_for_file(file_path)}
+    review, sections = get_code_review_for_file(file_path)
+    return {"review": review, "sections": sections}
 
 
 @app.get("/review_folder")
 async def review_folder(project_path: str, ignore_files, file_extensions) -> dict:
-    return {"review": get_code_review_for_folder(project_path, ignore_files, file_extensions)}
+    review, sections = get_code_review_for_folder(project_path, ignore_files, file_extensions)
+    return {"review": review, "sections": sections}
 
 
 @app.get("/bug_fixer")
@@ -0,0 +1,195 @@
+from agents.review_stream import REVIEW_SECTIONS, match_section_heading, stream_review
+from config import REVIEW_NUM_PREDICT, REVIEW_SECTION_HARD_LIMIT, REVIEW_SECTION_TOKEN_BUDGET
+
+
+class FakeStreamingLLM:
+    """Streams a fixed list of chunks and records how many were consumed and whether the stream was closed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.consumed = 0
+        self.closed = False
+
+    def stream(self, prompt):
+        try:
+            for chunk in self.chunks:
+                self.consumed += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def line_chunks(text):
+    return [line + "\n" for line in text.split("\n")]
+
+
+FULL_REVIEW = """Code Review
+1. Errors & Bugs
+- `total` is never initialised.
+2. Performance & Optimization
+- The nested loop is quadratic.
+3. Code Quality & Maintainability
+- Split `main` into smaller functions.
+4. Security & Reliability
+- User input is passed to `eval`.
+5. Best Practices & Standards
+- Use snake_case names."""
+
+
+def test_match_section_heading_formats():
+    assert match_section_heading("1. Errors & Bugs") == 0
+    assert match_section_heading("### **2. Performance & Optimization**") == 1
+    assert match_section_heading("**Code Quality & Maintainability**") == 2
+    assert match_section_heading("## Security and Reliability:") == 3
+    assert match_section_heading("5) Best Practices & Standards") == 4
+    assert match_section_heading("1. Errors are swallowed in the loop") == -1
+    assert match_section_heading("3. Code duplication") == -1
+
+
+def test_five_section_review():
+    llm = FakeStreamingLLM(line_chunks(FULL_REVIEW))
+    review, sections = stream_review(llm, "prompt")
+
+    assert review.startswith("Code Review\n1. Errors & Bugs")
+    assert sections["errors_and_bugs"] == "- `total` is never initialised."
+    assert sections["security_and_reliability"] == "- User input is passed to `eval`."
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+    assert llm.closed
+
+
+def test_unnumbered_headings():
+    text = "\n".join(f"**{title}**\n- note {index}" for index, (_, title) in enumerate(REVIEW_SECTIONS))
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["errors_and_bugs"] == "- note 0"
+    assert sections["best_practices_and_standards"] == "- note 4"
+    assert "- note 2" in review
+
+
+def test_no_headings_returns_raw_text():
+    text = "The code looks fine.\nConsider adding tests."
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert review == text
+    assert all(value == "" for value in sections.values())
+
+
+def test_numbered_list_items_stay_in_their_section():
+    text = FULL_REVIEW.replace(
+        "- `total` is never initialised.",
+        "2. Performance is poor because of copying.\n3. Code duplication in helpers."
+    ).replace(
+        "- The nested loop is quadratic.",
+        "1. Errors are swallowed in the loop."
+    )
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["errors_and_bugs"] == "2. Performance is poor because of copying.\n3. Code duplication in helpers."
+    assert sections["performance_and_optimization"] == "1. Errors are swallowed in the loop."
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+
+
+def test_code_snippet_with_repeated_lines_is_kept():
+    snippet = "```js\nif (a) {\n  x();\n}\nif (b) {\n  y();\n}\nif (c) {\n  z();\n}\n```"
+    text = FULL_REVIEW.replace("- The nested loop is quadratic.", snippet)
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["performance_and_optimization"] == snippet
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+
+
+def test_restart_stops_generation():
+    llm = FakeStreamingLLM(line_chunks(FULL_REVIEW + "\n1. Errors & Bugs\n- again") + ["unused\n"] * 50)
+    review, sections = stream_review(llm, "prompt")
+
+    assert "again" not in review
+    assert sections["errors_and_bugs"] == "- `total` is never initialised."
+    assert llm.consumed < len(llm.chunks)
+    assert llm.closed
+
+
+def test_repetition_loop_stops_generation():
+    llm = FakeStreamingLLM(line_chunks("1. Errors & Bugs\n" + "\n".join(["- Check the input."] * 40)))
+    review, sections = stream_review(llm, "prompt")
+
+    assert sections["errors_and_bugs"] == "- Check the input.\n- Check the input."
+    assert llm.consumed < len(llm.chunks)
+    assert llm.closed
+
+
+def test_trailer_after_last_section_stops_generation():
+    text = FULL_REVIEW.replace("\n1.", "\n## 1.").replace("\n2.", "\n## 2.").replace("\n3.", "\n## 3.") \
+        .replace("\n4.", "\n## 4.").replace("\n5.", "\n## 5.")
+    llm = FakeStreamingLLM(line_chunks(text + "\n## Summary\n- Overall fine.") + ["unused\n"] * 50)
+    review, sections = stream_review(llm, "prompt")
+
+    assert "Summary" not in review
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+    assert llm.consumed < len(llm.chunks)
+
+
+def test_hard_limit_overrun_drops_later_sections():
+    rambling = [f"- point {index}\n" for index in range(REVIEW_SECTION_HARD_LIMIT * 2)]
+    chunks = line_chunks("1. Errors & Bugs\n- bug\n2. Performance & Optimization") + rambling \
+        + line_chunks("3. Code Quality & Maintainability\n- unreachable")
+    llm = FakeStreamingLLM(chunks)
+    review, sections = stream_review(llm, "prompt")
+
+    kept = sections["performance_and_optimization"].split("\n")
+    assert len(kept) <= REVIEW_SECTION_TOKEN_BUDGET
+    assert sections["errors_and_bugs"] == "- bug"
+    assert sections["code_quality_and_maintainability"] == ""
+    assert llm.consumed <= len(chunks) - len(rambling) + REVIEW_SECTION_HARD_LIMIT + 2
+    assert llm.closed
+
+
+def test_subheadings_in_last_section_are_kept():
+    text = FULL_REVIEW.replace("\n5.", "\n## 5.").replace(
+        "- Use snake_case names.",
+        "**Naming:**\n- use snake_case\n### Error handling\n- catch specific exceptions"
+    )
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["best_practices_and_standards"] == \
+        "**Naming:**\n- use snake_case\n### Error handling\n- catch specific exceptions"
+
+
+def test_same_line_in_several_sections_is_not_repetition():
+    text = FULL_REVIEW.replace("- `total` is never initialised.", "- No issues found.") \
+        .replace("- The nested loop is quadratic.", "- No issues found.") \
+        .replace("- Split `main` into smaller functions.", "- No issues found.")
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["code_quality_and_maintainability"] == "- No issues found."
+    assert sections["security_and_reliability"] == "- User input is passed to `eval`."
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+
+
+def test_unclosed_code_fence_does_not_hide_later_headings():
+    text = FULL_REVIEW.replace("- The nested loop is quadratic.", "```python\nfor a in b:\n    pass")
+    review, sections = stream_review(FakeStreamingLLM(line_chunks(text)), "prompt")
+
+    assert sections["performance_and_optimization"] == "```python\nfor a in b:\n    pass\n```"
+    assert sections["code_quality_and_maintainability"] == "- Split `main` into smaller functions."
+    assert sections["best_practices_and_standards"] == "- Use snake_case names."
+
+
+def test_raw_fallback_is_kept_up_to_overall_cap():
+    chunks = [f"word{index} " for index in range(REVIEW_SECTION_HARD_LIMIT * 2)] + ["\n"]
+    assert len(chunks) < REVIEW_NUM_PREDICT
+    review, sections = stream_review(FakeStreamingLLM(["## Bugs\n"] + chunks), "prompt")
+
+    assert review.split("\n")[1].split() == [chunk.strip() for chunk in chunks[:-1]]
+    assert all(value == "" for value in sections.values())
+
+
+def test_soft_budget_overrun_keeps_later_sections():
+    rambling = [f"- point {index}\n" for index in range(REVIEW_SECTION_TOKEN_BUDGET + 30)]
+    assert len(rambling) < REVIEW_SECTION_HARD_LIMIT
+    chunks = line_chunks("1. Errors & Bugs\n- bug\n2. Performance & Optimization") + rambling \
+        + line_chunks("3. Code Quality & Maintainability\n- refactor\n5. Best Practices & Standards\n- names")
+    review, sections = stream_review(FakeStreamingLLM(chunks), "prompt")
+
+    assert len(sections["performance_and_optimization"].split("\n")) <= REVIEW_SECTION_TOKEN_BUDGET
+    assert sections["code_quality_and_maintainability"] == "- refactor"
+    assert sections["best_practices_and_standards"] == "- names"